@@ -20,13 +20,13 @@ import os
 import sys
 import re
 import json
-import glob
+import hashlib
 import webbrowser
 import requests
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from datetime import datetime, timedelta
@@ -36,6 +36,15 @@ from folium.plugins import HeatMap
 import folium
 from PIL import Image
 import shutil
+import io
+import queue
+import threading
+import tempfile
+import http.server
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from functools import partial
+from urllib.parse import quote, urlsplit
 from colorama import init, Fore, Style
 
 # Change working directory to the script's location
@@ -49,6 +58,38 @@ TIMESCALE = SKYFIELD_LOADER.timescale()
 # Global variable for output directory (to be set from config)
 OUTPUT_DIR = None
 
+# Render profiles control output size and quality. A dpi of None keeps each plot's native dpi,
+# a point budget of None draws every sample.
+RENDER_PROFILES = {
+    "draft": {"dpi": 72, "scale": 0.5, "format": "png", "point_budget": 500, "markers": False},
+    "web": {"dpi": 100, "scale": 0.75, "format": "webp", "point_budget": 2000, "markers": False},
+    "publication": {"dpi": None, "scale": 1.0, "format": "png", "point_budget": None, "markers": True},
+}
+RENDER_FORMATS = ("png", "webp", "svg")
+
+# Global variable for the active render profile (to be set from config)
+RENDER_PROFILE = RENDER_PROFILES["publication"]
+
+# SNR statistics a polar histogram cell can show
+POLAR_HISTOGRAM_STATS = ("mean", "max")
+
+# Output modes: "images" renders every per-pass plot server-side, "client" writes a compact
+# pass.json per pass that the shared viewer draws in the browser
+OUTPUT_MODES = ("images", "client")
+PASS_IMAGES = ("snr_elevation", "satellite_route", "heatmap", "polar", "polar_inverted")
+
+# Global variable for the output mode (to be set from config)
+OUTPUT_MODE = "images"
+
+# Local web server used to open client-rendered views, since browsers block fetch() on file:// URLs
+VIEWER_SERVER = None
+
+# Background writer for generated files while visualizations are rendered (None writes synchronously)
+OUTPUT_SINK = None
+
+# Figure templates built once per plot type and render profile; passes only swap the data
+PLOT_TEMPLATES = {}
+
 # HTML Templates remain unchanged
 IMAGES_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
@@ -96,6 +137,7 @@ SUMMARY_TEMPLATE = """<!DOCTYPE html>
 </head>
 <body>
   <h1>Satellite Passes Summary</h1>
+  {% if los_link %}<p><a href="{{ los_link }}">Line-of-sight analysis</a></p>{% endif %}
   <table id="summaryTable">
     <thead>
       <tr>
@@ -107,11 +149,17 @@ SUMMARY_TEMPLATE = """<!DOCTYPE html>
         <th onclick="sortTable(5, 'num')">End<BR>Azimuth</th>
         <th onclick="sortTable(6, 'num')">Max<BR>Elevation</th>
         <th onclick="sortTable(7)">Decoder</th>
+        <th onclick="sortTable(8, 'num')">Median<BR>SNR</th>
+        <th onclick="sortTable(9, 'num')">P90<BR>SNR</th>
+        <th onclick="sortTable(10, 'num')">Deframer<BR>Lock %</th>
+        <th onclick="sortTable(11, 'num')">Time to<BR>Sync (s)</th>
+        <th onclick="sortTable(12, 'num')">Mean<BR>BER</th>
         <th>SNR & Elevation</th>
         <th>Satellite Route</th>
         <th>Polar Plot</th>
         <th>Inverted Polar Plot</th>
         <th>Heatmap</th>
+        <th>Viewer</th>
         <th>Images</th>
       </tr>
     </thead>
@@ -126,11 +174,17 @@ SUMMARY_TEMPLATE = """<!DOCTYPE html>
         <td style="text-align:right">{{ pass.end_azimuth }}</td>
         <td style="text-align:right">{{ pass.max_elevation }}</td>
         <td>{{ pass.decoder }}</td>
+        <td style="text-align:right">{{ pass.snr_p50 }}</td>
+        <td style="text-align:right">{{ pass.snr_p90 }}</td>
+        <td style="text-align:right">{{ pass.lock_ratio }}</td>
+        <td style="text-align:right">{{ pass.time_to_sync }}</td>
+        <td style="text-align:right">{{ pass.mean_ber }}</td>
         <td>{% if pass.snr_elevation_link %}<a href="{{ pass.snr_elevation_link }}"><img src="{{ pass.snr_elevation_thumb }}" alt="SNR & Elevation"></a>{% else %}-{% endif %}</td>
         <td>{% if pass.satellite_route_link %}<a href="{{ pass.satellite_route_link }}"><img src="{{ pass.satellite_route_thumb }}" alt="Satellite Route"></a>{% else %}-{% endif %}</td>
         <td>{% if pass.polar_plot_link %}<a href="{{ pass.polar_plot_link }}"><img src="{{ pass.polar_plot_thumb }}" alt="Polar Plot"></a>{% else %}-{% endif %}</td>
         <td>{% if pass.inverted_polar_plot_link %}<a href="{{ pass.inverted_polar_plot_link }}"><img src="{{ pass.inverted_polar_plot_thumb }}" alt="Inverted Polar Plot"></a>{% else %}-{% endif %}</td>
         <td>{% if pass.heatmap_link %}<a href="{{ pass.heatmap_link }}">Heatmap</a>{% else %}-{% endif %}</td>
+        <td>{% if pass.viewer_link %}<a href="{{ pass.viewer_link }}">Viewer</a>{% else %}-{% endif %}</td>
         <td><a href="{{ pass.images_link }}">Images</a></td>
       </tr>
       {% endfor %}
@@ -187,15 +241,238 @@ VISUALIZATION_TEMPLATE = """<!DOCTYPE html>
 <body>
   <h1>Visualization for {{ folder_name }}</h1>
   <h2>SNR and Elevation Plot</h2>
-  <img src="SNR_and_Elevation_plot.png" alt="SNR and Elevation Plot">
+  <img src="SNR_and_Elevation_plot.{{ image_ext }}" alt="SNR and Elevation Plot">
   <h2>Satellite Route</h2>
-  <img src="satellite_route.png" alt="Satellite Route">
+  <img src="satellite_route.{{ image_ext }}" alt="Satellite Route">
   <h2>Satellite Route (Heatmap)</h2>
   <iframe src="satellite_route.html" width="100%" height="600px"></iframe>
   <h2>Polar Plot</h2>
-  <img src="polar_plot.png" alt="Polar Plot">
+  <img src="polar_plot.{{ image_ext }}" alt="Polar Plot">
   <h2>Inverted Polar Plot</h2>
-  <img src="polar_plot_inverted.png" alt="Inverted Polar Plot">
+  <img src="polar_plot_inverted.{{ image_ext }}" alt="Inverted Polar Plot">
+</body>
+</html>
+"""
+
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Pass Viewer</title>
+  <style>
+    body { font-family: Arial, sans-serif; margin: 40px; }
+    h1, h2 { text-align: center; }
+    canvas { display: block; margin: 0 auto 30px; max-width: 100%; border: 1px solid #ccc; }
+    #error { color: #c00; text-align: center; }
+  </style>
+</head>
+<body>
+  <h1 id="title">Pass Viewer</h1>
+  <p id="error"></p>
+  <h2>SNR and Elevation Plot</h2>
+  <canvas id="timeseries" width="1200" height="500"></canvas>
+  <h2>Satellite Route</h2>
+  <canvas id="route" width="1200" height="600"></canvas>
+  <h2>Polar Plot</h2>
+  <canvas id="polar" width="700" height="700"></canvas>
+  <h2>Inverted Polar Plot</h2>
+  <canvas id="polar_inverted" width="700" height="700"></canvas>
+  <script src="viewer.js"></script>
+</body>
+</html>
+"""
+
+VIEWER_JS = """(function () {
+  var PAD = 60;
+
+  function jet(v) {
+    v = Math.min(1, Math.max(0, v));
+    var c = [3, 2, 1].map(function (k) {
+      return Math.round(255 * Math.min(1, Math.max(0, 1.5 - Math.abs(4 * v - k))));
+    });
+    return "rgb(" + c.join(",") + ")";
+  }
+
+  function range(values) {
+    var lo = Infinity, hi = -Infinity;
+    values.forEach(function (v) {
+      if (v !== null) { lo = Math.min(lo, v); hi = Math.max(hi, v); }
+    });
+    if (lo === Infinity) return [0, 1];
+    return lo === hi ? [lo, lo + 1] : [lo, hi];
+  }
+
+  function clock(data, offset) {
+    return new Date((data.t0 + offset) * 1000).toISOString().substr(11, 8);
+  }
+
+  function drawLine(ctx, xs, ys, color, dash) {
+    ctx.strokeStyle = color;
+    ctx.setLineDash(dash || []);
+    ctx.beginPath();
+    var pen = false;
+    for (var i = 0; i < xs.length; i++) {
+      if (ys[i] === null) { pen = false; continue; }
+      if (pen) ctx.lineTo(xs[i], ys[i]); else ctx.moveTo(xs[i], ys[i]);
+      pen = true;
+    }
+    ctx.stroke();
+    ctx.setLineDash([]);
+  }
+
+  function drawColorbar(ctx, x, y, height, snr) {
+    for (var i = 0; i < height; i++) {
+      ctx.fillStyle = jet(1 - i / height);
+      ctx.fillRect(x, y + i, 15, 1);
+    }
+    ctx.fillStyle = "#000";
+    ctx.textAlign = "left";
+    ctx.fillText(snr[1].toFixed(1) + " dB", x + 20, y + 5);
+    ctx.fillText(snr[0].toFixed(1) + " dB", x + 20, y + height);
+  }
+
+  function drawTimeSeries(canvas, data) {
+    var ctx = canvas.getContext("2d"), w = canvas.width, h = canvas.height;
+    var tr = range(data.t), sr = range(data.snr);
+    var x = function (v) { return PAD + (v - tr[0]) / (tr[1] - tr[0]) * (w - 2 * PAD); };
+    var ySnr = function (v) { return v === null ? null : h - PAD - (v - sr[0]) / (sr[1] - sr[0]) * (h - 2 * PAD); };
+    var yEl = function (v) { return v === null ? null : h - PAD - v / 90 * (h - 2 * PAD); };
+    ctx.strokeStyle = "#999";
+    ctx.strokeRect(PAD, PAD, w - 2 * PAD, h - 2 * PAD);
+    ctx.font = "12px Arial";
+    for (var i = 0; i <= 5; i++) {
+      var f = i / 5, yy = h - PAD - f * (h - 2 * PAD), xx = PAD + f * (w - 2 * PAD);
+      ctx.fillStyle = "#1f77b4";
+      ctx.textAlign = "right";
+      ctx.fillText((sr[0] + f * (sr[1] - sr[0])).toFixed(1), PAD - 5, yy + 4);
+      ctx.fillStyle = "#2ca02c";
+      ctx.textAlign = "left";
+      ctx.fillText((f * 90).toFixed(0), w - PAD + 5, yy + 4);
+      ctx.fillStyle = "#000";
+      ctx.textAlign = "center";
+      ctx.fillText(clock(data, tr[0] + f * (tr[1] - tr[0])), xx, h - PAD + 18);
+    }
+    ctx.fillText("SNR (dB) / Elevation (deg)", w / 2, PAD - 15);
+    var xs = data.t.map(x);
+    drawLine(ctx, xs, data.snr.map(ySnr), "#1f77b4");
+    drawLine(ctx, xs, data.elevation.map(yEl), "#2ca02c", [6, 4]);
+  }
+
+  function drawPoints(ctx, xs, ys, snr, sr, radius) {
+    for (var i = 0; i < xs.length; i++) {
+      if (xs[i] === null || ys[i] === null || snr[i] === null) continue;
+      ctx.fillStyle = jet((snr[i] - sr[0]) / (sr[1] - sr[0]));
+      ctx.beginPath();
+      ctx.arc(xs[i], ys[i], radius, 0, 2 * Math.PI);
+      ctx.fill();
+    }
+  }
+
+  function drawPolar(canvas, data, inverted) {
+    var ctx = canvas.getContext("2d"), w = canvas.width, h = canvas.height;
+    var cx = w / 2, cy = h / 2, r = Math.min(w, h) / 2 - PAD, sr = range(data.snr);
+    ctx.strokeStyle = "#ccc";
+    ctx.fillStyle = "#000";
+    ctx.font = "12px Arial";
+    ctx.textAlign = "center";
+    for (var el = 0; el <= 90; el += 15) {
+      var rr = (inverted ? 90 - el : el) / 90 * r;
+      ctx.beginPath();
+      ctx.arc(cx, cy, rr, 0, 2 * Math.PI);
+      ctx.stroke();
+      ctx.fillText(String(el), cx + 4, cy - rr - 2);
+    }
+    for (var az = 0; az < 360; az += 45) {
+      var a = az * Math.PI / 180;
+      ctx.beginPath();
+      ctx.moveTo(cx, cy);
+      ctx.lineTo(cx + r * Math.sin(a), cy - r * Math.cos(a));
+      ctx.stroke();
+      ctx.fillText(az + "\u00b0", cx + (r + 20) * Math.sin(a), cy - (r + 20) * Math.cos(a) + 4);
+    }
+    var xs = [], ys = [];
+    for (var i = 0; i < data.azimuth.length; i++) {
+      var e = data.elevation[i], z = data.azimuth[i];
+      if (e === null || z === null || e < 0) { xs.push(null); ys.push(null); continue; }
+      var d = (inverted ? 90 - e : e) / 90 * r, t = z * Math.PI / 180;
+      xs.push(cx + d * Math.sin(t));
+      ys.push(cy - d * Math.cos(t));
+    }
+    drawPoints(ctx, xs, ys, data.snr, sr, 5);
+    drawColorbar(ctx, w - PAD + 5, PAD, h - 2 * PAD, sr);
+  }
+
+  function drawRoute(canvas, data) {
+    var ctx = canvas.getContext("2d"), w = canvas.width - PAD, h = canvas.height, sr = range(data.snr);
+    var x = function (v) { return v === null ? null : (v + 180) / 360 * w; };
+    var y = function (v) { return v === null ? null : (90 - v) / 180 * h; };
+    ctx.fillStyle = "#eef4fb";
+    ctx.fillRect(0, 0, w, h);
+    ctx.strokeStyle = "#ccc";
+    for (var lon = -180; lon <= 180; lon += 30) {
+      ctx.beginPath(); ctx.moveTo(x(lon), 0); ctx.lineTo(x(lon), h); ctx.stroke();
+    }
+    for (var lat = -90; lat <= 90; lat += 30) {
+      ctx.beginPath(); ctx.moveTo(0, y(lat)); ctx.lineTo(w, y(lat)); ctx.stroke();
+    }
+    drawPoints(ctx, data.lon.map(x), data.lat.map(y), data.snr, sr, 4);
+    ctx.font = "12px Arial";
+    drawColorbar(ctx, w + 5, PAD, h - 2 * PAD, sr);
+  }
+
+  function render(data) {
+    document.getElementById("title").textContent = "Visualization for " + data.folder_name;
+    document.title = data.folder_name;
+    drawTimeSeries(document.getElementById("timeseries"), data);
+    drawRoute(document.getElementById("route"), data);
+    drawPolar(document.getElementById("polar"), data, false);
+    drawPolar(document.getElementById("polar_inverted"), data, true);
+  }
+
+  var folder = decodeURIComponent(location.hash.slice(1));
+  fetch(encodeURIComponent(folder) + "/pass.json")
+    .then(function (response) {
+      if (!response.ok) throw new Error(response.status + " " + response.statusText);
+      return response.json();
+    })
+    .then(render)
+    .catch(function (err) {
+      document.getElementById("error").textContent = "Could not load pass data for '" + folder + "' (" + err +
+        "). Open the summary from the menu so the viewer is served over HTTP.";
+    });
+})();
+"""
+
+LOS_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Line-of-Sight Analysis</title>
+  <style>
+    body { font-family: Arial, sans-serif; margin: 40px; }
+    table { border-collapse: collapse; margin-bottom: 40px; }
+    th, td { padding: 6px 10px; border: 1px solid #ccc; text-align: right; }
+    th { background-color: #f4f4f4; }
+    img { max-width: 100%; height: auto; }
+    h1, h2 { text-align: center; }
+  </style>
+</head>
+<body>
+  <h1>Line-of-Sight Analysis</h1>
+  <p>{{ samples }} samples from {{ passes }} passes. A sector's horizon is the lowest elevation band where the
+     deframer is locked for at least {{ lock_threshold }}% of at least {{ min_samples }} samples. Sectors that were
+     observed but never reliable are marked "never" and drawn fully blocked; sectors without samples are marked
+     "no data" and hatched.</p>
+  <h2>Horizon Mask</h2>
+  <img src="{{ horizon_plot }}" alt="Horizon Mask">
+  {% for table in tables %}
+  <h2>{{ table.title }}</h2>
+  {{ table.html }}
+  {% endfor %}
+  <h2>SNR by Elevation</h2>
+  <img src="{{ elevation_plot }}" alt="SNR by Elevation">
 </body>
 </html>
 """
@@ -218,7 +495,43 @@ def load_config():
         "description_7": "The elevation of the observer in meters",
         "OBSERVER_ELEVATION": 0,
         "description_8": "The number of days before the TLE file is considered old",
-        "UPDATE_DAYS": 1
+        "UPDATE_DAYS": 1,
+        "description_9": "Combined polar plots with more samples than this are drawn as an azimuth x elevation histogram instead of a scatter",
+        "POLAR_HISTOGRAM_THRESHOLD": 5000,
+        "description_10": "The number of azimuth and elevation bins used by the polar histogram",
+        "POLAR_HISTOGRAM_BINS": [72, 18],
+        "description_11": "The SNR statistic shown by each polar histogram cell: mean or max",
+        "POLAR_HISTOGRAM_STAT": "mean",
+        "description_12": "The render profile for plots: draft, web or publication",
+        "RENDER_PROFILE": "publication",
+        "description_13": "Overrides the image format of the render profile: png, webp or svg. Leave empty to use the profile default",
+        "RENDER_FORMAT": "",
+        "description_14": "Overrides the maximum number of points per pass plotted by the draft and web profiles. 0 uses the profile default",
+        "RENDER_POINT_BUDGET": 0,
+        "description_15": "images renders every per-pass plot, client writes a small pass.json per pass that is drawn in the browser by a shared viewer",
+        "OUTPUT_MODE": "images",
+        "description_16": "In client mode, the per-pass images that are still rendered: snr_elevation, satellite_route, heatmap, polar, polar_inverted",
+        "CLIENT_RENDERED_IMAGES": [],
+        "description_17": "The TLE catalogs to download and merge into the TLE file",
+        "TLE_URLS": ["https://celestrak.org/NORAD/elements/weather.txt"],
+        "description_18": "The connect and read timeouts in seconds for TLE downloads, as [connect, read] or one number for both",
+        "TLE_TIMEOUT": [5, 30],
+        "description_19": "The number of generated files that may wait to be written in the background",
+        "WRITE_QUEUE_SIZE": 16,
+        "description_20": "The number of recent log records remembered to skip duplicates from overlapping logs. Each costs about 90 bytes of memory (about 9 MB at 100000, roughly a day of progress lines)",
+        "DEDUP_WINDOW": 100000,
+        "description_21": "The number of azimuth sectors used by the line-of-sight analysis",
+        "LOS_AZIMUTH_SECTORS": 36,
+        "description_22": "The height in degrees of the elevation bands used by the line-of-sight analysis",
+        "LOS_ELEVATION_STEP": 5,
+        "description_23": "The deframer lock ratio (0-1) an elevation band needs to count as reliable decode for the horizon mask",
+        "LOS_LOCK_THRESHOLD": 0.8,
+        "description_24": "The minimum number of samples an elevation band needs to count towards the horizon mask",
+        "LOS_MIN_SAMPLES": 20,
+        "description_25": "How many seconds a log pass may start from a dataset timestamp and still be matched to that dataset",
+        "DATASET_MATCH_TOLERANCE": 300,
+        "description_26": "The longest expected pass in seconds; log samples further than this from a dataset timestamp are not matched to it",
+        "MAX_PASS_DURATION": 1200
     }
     if os.path.exists(config_path):
         try:
@@ -238,6 +551,21 @@ def load_config():
         exit(1)
     return default_config
 
+def get_render_profile(config):
+    name = config.get("RENDER_PROFILE", "publication")
+    if name not in RENDER_PROFILES:
+        print(f"Unknown render profile '{name}'; using 'publication'.")
+        name = "publication"
+    profile = dict(RENDER_PROFILES[name])
+    image_format = (config.get("RENDER_FORMAT") or "").lower()
+    if image_format in RENDER_FORMATS:
+        profile["format"] = image_format
+    elif image_format:
+        print(f"Unknown render format '{image_format}'; using '{profile['format']}'.")
+    if profile["point_budget"] is not None and config.get("RENDER_POINT_BUDGET"):
+        profile["point_budget"] = int(config["RENDER_POINT_BUDGET"])
+    return profile
+
 def find_log_files(directory):
     if not os.path.exists(directory):
         return []
@@ -267,9 +595,51 @@ def extract_values_from_progress_line(line, folder_name):
         values["Deframer"] = deframer_match.group(1)
     return values
 
-def process_log_files(files):
-    log_entries, current_entry, folder_name = [], None, None
+def file_fingerprint(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.digest()
+
+def record_key(line):
+    # The progress line holds the timestamp and every field value, so hashing it alone identifies a
+    # record before any of it is parsed. The folder is left out: it carries over from the previous file,
+    # so a rotated log starting mid-pass would key its overlap under the wrong folder.
+    digest = hashlib.blake2b(line.strip().encode("utf-8", "replace"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+# Remembers the most recent `capacity` keys. Overlapping rotated or copied logs repeat records close
+# together, so a bounded window catches them without holding every key of the whole history. Each key
+# costs about 90 bytes (the int, its set slot and its deque slot), so capacity sets the memory used.
+class BoundedSeenSet:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.keys = set()
+        self.order = deque()
+
+    def add(self, key):
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.order.append(key)
+        if len(self.order) > self.capacity:
+            self.keys.discard(self.order.popleft())
+        return True
+
+def process_log_files(files, dedup_window=100000):
+    log_entries = []
+    seen_files, seen_records = set(), BoundedSeenSet(dedup_window)
+    duplicate_files = duplicate_records = 0
     for file in files:
+        fingerprint = file_fingerprint(file)
+        if fingerprint in seen_files:
+            duplicate_files += 1
+            continue
+        seen_files.add(fingerprint)
+        # Each file starts with no pass and no folder: concurrent receivers write separate logs, and a log
+        # that starts mid-pass is attributed by the time join instead of inheriting another file's folder
+        current_entry, folder_name = None, None
         with open(file, "r") as f:
             for line in f:
                 if "(I) Start processing..." in line:
@@ -286,49 +656,107 @@ def process_log_files(files):
                 elif "Generated folder name" in line:
                     folder_name = re.search(r"[^/\\]+$", line).group(0).strip()
                 elif current_entry and "(I) Progress" in line:
+                    if not seen_records.add(record_key(line)):
+                        duplicate_records += 1
+                        continue
                     if not current_entry["start"]:
                         ts_match = re.match(r"\[(.*?)\]", line)
                         if ts_match:
                             current_entry["start"] = convert_timestamp(ts_match.group(1))
                     vals = extract_values_from_progress_line(line, folder_name)
                     current_entry["logs"].append(vals)
-    if current_entry:
-        log_entries.append(current_entry)
+        if current_entry:
+            log_entries.append(current_entry)
+    if duplicate_files or duplicate_records:
+        print(f"Skipped {duplicate_files} duplicate log files and {duplicate_records} duplicate records.")
     return log_entries
 
 def create_dataframe(entries):
-    rows = [log for entry in entries for log in entry["logs"]]
+    # log_pass numbers the Start/Stop processing block a sample came from, for the time-based dataset join
+    rows = [{**log, "log_pass": i} for i, entry in enumerate(entries) for log in entry["logs"]]
     return pd.DataFrame(rows)
 
 def merge_rows(df):
-    def merge_group(group):
-        return group.apply(lambda col: group[col.name].dropna().iloc[0] if not group[col.name].dropna().empty else None)
-    try:
-        grouped = df.groupby("Timestamp", group_keys=False, include_groups=False)
-    except TypeError:
-        grouped = df.groupby("Timestamp", group_keys=False)
-    return grouped.apply(merge_group).reset_index(drop=True)
-
-def find_json_file(directory, folder_name):
-    files = glob.glob(os.path.join(directory, folder_name, "dataset.json"))
-    return files[0] if files else None
+    # First non-null value of every column per timestamp within one log pass, so the partial progress lines
+    # of a pass combine while concurrent passes logging in the same second stay apart
+    return df.groupby(["log_pass", "Timestamp"], as_index=False).first()
 
 def read_dataset_json_file(file_path):
     with open(file_path, "r") as file:
         data = json.load(file)
     return data.get("satellite"), data.get("timestamp")
 
-def add_dataset_json_data(df, json_directory):
-    df["satellite"] = "Unknown"
-    df["pass_timestamp"] = None
-    for i, row in df.iterrows():
-        folder_name = row.get("folder_name") or "default"
-        json_file = find_json_file(json_directory, folder_name)
-        if json_file:
-            satellite, timestamp = read_dataset_json_file(json_file)
-            df.at[i, "satellite"] = satellite
-            df.at[i, "pass_timestamp"] = convert_timestamp_to_datetime(timestamp) if timestamp != -1 else None
-    return df
+def load_dataset_index(json_directory):
+    records = []
+    with os.scandir(json_directory) as entries:
+        for entry in entries:
+            json_file = os.path.join(entry.path, "dataset.json")
+            if not entry.is_dir() or not os.path.exists(json_file):
+                continue
+            try:
+                satellite, timestamp = read_dataset_json_file(json_file)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable dataset '{json_file}': {e}")
+                continue
+            records.append({"folder_name": entry.name, "satellite": satellite,
+                            "pass_timestamp": convert_timestamp_to_datetime(timestamp) if timestamp != -1 else None})
+    index = pd.DataFrame(records, columns=["folder_name", "satellite", "pass_timestamp"])
+    index["pass_timestamp"] = pd.to_datetime(index["pass_timestamp"])
+    return index.sort_values("pass_timestamp", na_position="last").reset_index(drop=True)
+
+def add_dataset_json_data(df, json_directory, tolerance=300, max_duration=1200):
+    datasets = load_dataset_index(json_directory)
+    by_folder = datasets.set_index("folder_name")
+    timed = datasets.dropna(subset=["pass_timestamp"])
+    # Datasets that started in the same second (concurrent passes on two receivers) cannot be told apart by
+    # time. The folder-name fast path still matches them; otherwise their samples are left unmatched.
+    shared = timed["pass_timestamp"].duplicated(keep=False)
+    starts = timed.drop_duplicates("pass_timestamp")["pass_timestamp"].reset_index(drop=True)
+    folder_at = timed[~shared].set_index("pass_timestamp")["folder_name"]
+    timestamps = pd.to_datetime(df["Timestamp"])
+    tolerance, max_duration = pd.Timedelta(seconds=tolerance), pd.Timedelta(seconds=max_duration)
+
+    # Fast path: the folder named in the log, unless its dataset time contradicts the sample time
+    # (the folder line of a neighbouring pass was logged out of order)
+    folder = df["folder_name"].where(df["folder_name"].isin(by_folder.index))
+    start = pd.to_datetime(folder.map(by_folder["pass_timestamp"]))
+    matched = folder.notna() & (start.isna() | timestamps.between(start - tolerance, start + max_duration))
+    folder = folder.where(matched)
+    ambiguous = pd.Series(False, index=df.index)
+
+    # Whole log passes: the dataset that started nearest the first sample, within tolerance and before the last
+    if "log_pass" in df and not starts.empty and not matched.all():
+        spans = timestamps.groupby(df["log_pass"]).agg(["min", "max"]).dropna().sort_values("min").reset_index()
+        candidates = pd.merge_asof(spans, starts.to_frame(), left_on="min", right_on="pass_timestamp",
+                                   direction="nearest", tolerance=tolerance)
+        candidates = candidates[candidates["pass_timestamp"] <= candidates["max"]]
+        pass_start = df["log_pass"].map(candidates.set_index("log_pass")["pass_timestamp"]).where(folder.isna())
+        resolved = pass_start.map(folder_at)
+        ambiguous |= pass_start.notna() & resolved.isna()
+        folder = folder.fillna(resolved)
+
+    # Remaining samples: the dataset whose time window, up to the next dataset or max_duration, contains them
+    remaining = np.flatnonzero((folder.isna() & ~ambiguous & timestamps.notna()).to_numpy())
+    if len(remaining) and not starts.empty:
+        ends = np.minimum(starts.shift(-1).fillna(starts.iloc[-1] + max_duration), starts + max_duration)
+        intervals = pd.IntervalIndex.from_arrays(starts, ends, closed="left")
+        positions = intervals.get_indexer(timestamps.iloc[remaining])
+        found = positions >= 0
+        resolved = starts.iloc[positions[found]].map(folder_at).to_numpy()
+        folder.iloc[remaining[found]] = resolved
+        ambiguous.iloc[remaining[found][pd.isna(resolved)]] = True
+
+    by_time = int((folder.notna() & ~matched).sum())
+    unmatched = int(folder.isna().sum())
+    if by_time or unmatched:
+        print(f"Matched {by_time} samples to datasets by time; {unmatched} samples matched no dataset.")
+    if ambiguous.any():
+        print(f"{int(ambiguous.sum())} unmatched samples fall in passes of datasets that started at the same time; "
+              "check the Generated folder name lines in their logs.")
+    df["folder_name"] = folder.fillna(df["folder_name"])
+    df["satellite"] = folder.map(by_folder["satellite"]).fillna("Unknown")
+    df["pass_timestamp"] = folder.map(by_folder["pass_timestamp"])
+    return df.drop(columns=["log_pass"], errors="ignore")
 
 def extract_decoder_from_folder_name(folder_name):
     if not folder_name:
@@ -374,6 +802,398 @@ def add_azimuth_elevation_distance(df, satellites, obs_lat, obs_lon, obs_elev):
             results_df[col] = None
     return pd.concat([df, results_df], axis=1)
 
+# Process umask, read once at import since reading it means briefly changing it, which is not thread safe
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+def write_file_atomic(path, data):
+    # Write next to the target and swap it in, so readers never see a half-written file
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=directory, prefix=".tmp_", delete=False) as f:
+        f.write(data)
+        tmp_path = f.name
+    try:
+        # Temporary files are created 0600; give the result the mode of the file it replaces, or the
+        # umask default for a new file, so the output stays readable when served from a shared directory
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def make_thumbnail_bytes(image_data, size=(200, 200)):
+    img = Image.open(io.BytesIO(image_data))
+    img.thumbnail(size)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+# Writes generated files from a bounded queue on background threads. Rendering hands over encoded
+# bytes and moves on; a full queue blocks the producer so memory stays bounded. Write errors are
+# collected and returned by close().
+class OutputSink:
+    def __init__(self, max_pending=16, workers=2):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.errors = []
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                return
+            path, data, thumb_path, thumb_size = job
+            try:
+                write_file_atomic(path, data)
+                if thumb_path:
+                    write_file_atomic(thumb_path, make_thumbnail_bytes(data, (thumb_size, thumb_size)))
+            except Exception as e:
+                self.errors.append((path, e))
+            finally:
+                self.queue.task_done()
+
+    def write(self, path, data, thumb_path=None, thumb_size=200):
+        self.queue.put((path, data, thumb_path, thumb_size))
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        return self.errors
+
+def write_output(path, data, thumb_path=None, thumb_size=200):
+    if OUTPUT_SINK is not None:
+        OUTPUT_SINK.write(path, data, thumb_path, thumb_size)
+        return
+    write_file_atomic(path, data)
+    if thumb_path:
+        write_file_atomic(thumb_path, make_thumbnail_bytes(data, (thumb_size, thumb_size)))
+
+# Per-pass statistics (counts, sums, extremes, first/last azimuth and an SNR histogram) are recomputed
+# from the samples whenever a pass is processed, so the summary renders from the stored table alone
+SNR_HIST_EDGES = np.arange(0, 40.5, 0.5)
+
+def compute_pass_statistics(df):
+    if df.empty:
+        return None
+    df = df.assign(
+        Timestamp=pd.to_datetime(df["Timestamp"]),
+        SNR=pd.to_numeric(df["SNR"], errors="coerce"),
+        BER=pd.to_numeric(df["BER"], errors="coerce"),
+        Azimuth=pd.to_numeric(df["Azimuth"], errors="coerce"),
+        Elevation=pd.to_numeric(df["Elevation"], errors="coerce"),
+        viterbi_synced=df["Viterbi"] == "SYNCED",
+        deframer_synced=df["Deframer"] == "SYNCED",
+    ).sort_values("Timestamp")
+    df["sync_time"] = df["Timestamp"].where(df["viterbi_synced"] | df["deframer_synced"])
+    stats = df.groupby("folder_name").agg(
+        satellite=("satellite", "first"),
+        decoder=("decoder", "first"),
+        pass_timestamp=("pass_timestamp", "first"),
+        pass_start=("Timestamp", "min"),
+        pass_end=("Timestamp", "max"),
+        samples=("Timestamp", "size"),
+        snr_count=("SNR", "count"),
+        snr_sum=("SNR", "sum"),
+        snr_min=("SNR", "min"),
+        snr_max=("SNR", "max"),
+        max_elevation=("Elevation", "max"),
+        viterbi_synced=("viterbi_synced", "sum"),
+        deframer_synced=("deframer_synced", "sum"),
+        first_sync=("sync_time", "min"),
+        ber_count=("BER", "count"),
+        ber_sum=("BER", "sum"),
+    )
+    located = df[df["Azimuth"].notna()].groupby("folder_name")
+    stats["start_azimuth"] = located["Azimuth"].first()
+    stats["end_azimuth"] = located["Azimuth"].last()
+
+    snr = df[df["SNR"].notna()]
+    bins = np.clip(np.searchsorted(SNR_HIST_EDGES, snr["SNR"].to_numpy(), side="right") - 1, 0, len(SNR_HIST_EDGES) - 2)
+    counts = pd.crosstab(snr["folder_name"], bins).reindex(columns=range(len(SNR_HIST_EDGES) - 1), fill_value=0)
+    empty = np.zeros(len(SNR_HIST_EDGES) - 1, dtype=np.int64)
+    stats["snr_hist"] = [counts.loc[f].to_numpy() if f in counts.index else empty.copy() for f in stats.index]
+    return stats
+
+def load_pass_statistics():
+    if not os.path.exists("pass_statistics.csv"):
+        return None
+    stats = pd.read_csv("pass_statistics.csv", index_col="folder_name",
+                        parse_dates=["pass_timestamp", "pass_start", "pass_end", "first_sync"])
+    # The SNR histogram is stored sparsely as "bin:count" pairs
+    size = len(SNR_HIST_EDGES) - 1
+    def parse_hist(text):
+        hist = np.zeros(size, dtype=np.int64)
+        for pair in str(text).split() if pd.notna(text) else []:
+            index, count = pair.split(":")
+            hist[int(index)] = int(count)
+        return hist
+    stats["snr_hist"] = stats["snr_hist"].apply(parse_hist)
+    stats["retention"] = stats["retention"].fillna("") if "retention" in stats else ""
+    return stats
+
+def save_pass_statistics(stats):
+    stats = stats.copy()
+    stats["snr_hist"] = stats["snr_hist"].apply(lambda h: " ".join(f"{i}:{c}" for i, c in enumerate(h) if c))
+    stats.to_csv("pass_statistics.csv", index_label="folder_name")
+
+def update_pass_statistics(stats):
+    # Reprocessing re-reads every sample of a pass, so fresh rows replace stored ones rather than merging
+    # into them; passes that were compacted away keep their stored statistics
+    existing = load_pass_statistics()
+    stats = stats.assign(retention="")
+    if existing is not None:
+        stats["retention"] = existing["retention"].reindex(stats.index).fillna("")
+        stats = pd.concat([existing[~existing.index.isin(stats.index)], stats])
+    save_pass_statistics(stats.sort_values("pass_start"))
+    print("Pass statistics saved.")
+
+# Retention applied to a pass, recorded in the "retention" column of pass_statistics.csv so later runs
+# do not bring it back. Each level implies the ones below it:
+#   purged     visualizations removed; the pass is no longer rendered
+#   compacted  sample rows dropped; processing skips the pass's samples
+#   removed    purged by satellite or decoder; skipped everywhere and hidden from the summary
+RETENTION_LEVELS = {"": 0, "purged": 1, "compacted": 2, "removed": 3}
+
+def retained_passes(level):
+    # Passes whose retention is at least `level`
+    stats = load_pass_statistics()
+    if stats is None:
+        return set()
+    return set(stats.index[stats["retention"].map(RETENTION_LEVELS).fillna(0) >= RETENTION_LEVELS[level]])
+
+def histogram_percentile(hist, q):
+    total = hist.sum()
+    if total == 0:
+        return None
+    target = q / 100 * total
+    cumulative = np.cumsum(hist)
+    index = min(int(np.searchsorted(cumulative, target)), len(hist) - 1)
+    before = cumulative[index - 1] if index else 0
+    fraction = (target - before) / hist[index] if hist[index] else 0
+    return SNR_HIST_EDGES[index] + fraction * (SNR_HIST_EDGES[index + 1] - SNR_HIST_EDGES[index])
+
+# Line-of-sight analytics keep per (pass, satellite, decoder, azimuth sector, elevation band) sums, so tables
+# and plots are built without reading samples. Keeping rows per pass lets a pass whose sample count changed
+# between runs (a log still being written, or split across files) be rebinned without touching the others.
+LOS_KEYS = ["folder_name", "satellite", "decoder", "az_bin", "el_bin"]
+LOS_SUMS = ["samples", "snr_sum", "snr_sq_sum", "synced"]
+
+def bin_los_samples(df, az_sectors, el_step):
+    az = pd.to_numeric(df["Azimuth"], errors="coerce")
+    el = pd.to_numeric(df["Elevation"], errors="coerce")
+    snr = pd.to_numeric(df["SNR"], errors="coerce")
+    valid = az.notna() & el.between(0, 90) & snr.notna()
+    binned = pd.DataFrame({
+        "folder_name": df.loc[valid, "folder_name"],
+        "satellite": df.loc[valid, "satellite"],
+        "decoder": df.loc[valid, "decoder"],
+        "az_bin": (az[valid] % 360 // (360 / az_sectors)).astype(int).clip(0, az_sectors - 1),
+        "el_bin": (el[valid] // el_step).astype(int).clip(0, int(np.ceil(90 / el_step)) - 1),
+        "samples": 1,
+        "snr_sum": snr[valid],
+        "snr_sq_sum": snr[valid] ** 2,
+        "synced": (df.loc[valid, "Deframer"] == "SYNCED").astype(int),
+    })
+    return binned.groupby(LOS_KEYS, as_index=False)[LOS_SUMS].sum()
+
+def load_los_histograms():
+    if not os.path.exists("los_histograms.csv") or not os.path.exists("los_histograms.json"):
+        return None, None
+    with open("los_histograms.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return pd.read_csv("los_histograms.csv"), meta
+
+def save_los_histograms(hist, meta):
+    hist.to_csv("los_histograms.csv", index=False)
+    with open("los_histograms.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+def update_los_histograms(df, az_sectors=36, el_step=5):
+    hist, meta = load_los_histograms()
+    if meta is not None and (meta["azimuth_sectors"], meta["elevation_step"]) != (az_sectors, el_step):
+        print("Line-of-sight bins changed; rebuilding histograms from the available sample data.")
+        hist, meta = None, None
+    elif meta is not None and not isinstance(meta["passes"], dict):
+        print("Line-of-sight histograms have no per-pass counts; rebuilding from the available sample data.")
+        hist, meta = None, None
+    if meta is None:
+        meta = {"azimuth_sectors": az_sectors, "elevation_step": el_step, "passes": {}}
+    # meta["passes"] holds the sample count each pass was binned with. Passes that are new or whose count
+    # changed are rebinned, so reprocessing never counts a sample twice and a partial pass is completed.
+    counts = df.groupby("folder_name").size()
+    changed = counts.index[counts != pd.Series(meta["passes"], dtype=float).reindex(counts.index)]
+    if changed.empty and hist is not None:
+        return hist, meta
+    partial = bin_los_samples(df[df["folder_name"].isin(changed)], az_sectors, el_step)
+    if hist is not None:
+        partial = pd.concat([hist[~hist["folder_name"].isin(changed)], partial], ignore_index=True)
+    meta["passes"].update({folder: int(counts[folder]) for folder in changed})
+    save_los_histograms(partial, meta)
+    print(f"Line-of-sight histograms updated with {len(changed)} passes.")
+    return partial, meta
+
+def los_table(hist, by):
+    table = hist.groupby(by)[LOS_SUMS].sum()
+    table["mean_snr"] = table["snr_sum"] / table["samples"]
+    table["std_snr"] = np.sqrt(np.maximum(table["snr_sq_sum"] / table["samples"] - table["mean_snr"] ** 2, 0))
+    table["lock_ratio"] = table["synced"] / table["samples"]
+    return table.drop(columns=["snr_sum", "snr_sq_sum", "synced"])
+
+def estimate_horizon_mask(hist, az_sectors, el_step, lock_threshold=0.8, min_samples=20):
+    # Lowest elevation band per decoder and azimuth sector where decoding is reliable. Sectors with samples
+    # but no reliable band get 90 (blocked up to the zenith); sectors without samples stay NaN.
+    table = los_table(hist, ["decoder", "az_bin", "el_bin"]).reset_index()
+    reliable = table[(table["lock_ratio"] >= lock_threshold) & (table["samples"] >= min_samples)]
+    lowest = reliable.groupby(["decoder", "az_bin"])["el_bin"].min() * el_step
+    observed = table.groupby(["decoder", "az_bin"])["samples"].sum().index
+    lowest = lowest.reindex(observed).fillna(90.0)
+    decoders = sorted(hist["decoder"].unique())
+    index = pd.MultiIndex.from_product([decoders, range(az_sectors)], names=["decoder", "az_bin"])
+    return lowest.reindex(index).unstack("decoder")
+
+def generate_los_report(hist, meta, lock_threshold=0.8, min_samples=20):
+    if hist is None or hist.empty:
+        print("No data for line-of-sight analysis.")
+        return
+    az_sectors, el_step = meta["azimuth_sectors"], meta["elevation_step"]
+    sector_width = 360 / az_sectors
+    mask = estimate_horizon_mask(hist, az_sectors, el_step, lock_threshold, min_samples)
+
+    fig = Figure(figsize=profile_figsize(12, 12))
+    ax = fig.add_subplot(projection="polar")
+    theta = np.deg2rad((mask.index.to_numpy() + 0.5) * sector_width)
+    width = np.deg2rad(sector_width)
+    for decoder in mask.columns:
+        observed = mask[decoder].notna().to_numpy()
+        heights = mask[decoder].to_numpy()[observed]
+        # Sky view: horizon on the rim, the blocked band runs from the rim up to the mask elevation
+        ax.bar(theta[observed], heights, width=width, bottom=90 - heights, alpha=0.4, label=decoder.upper())
+    unobserved = mask.isna().all(axis=1).to_numpy()
+    if unobserved.any():
+        ax.bar(theta[unobserved], 90, width=width, bottom=0, fill=False, hatch="//", edgecolor="0.7",
+               linewidth=0, label="No data")
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    ax.set_ylim(0, 90)
+    ax.set_yticks(np.arange(0, 91, 15))
+    ax.set_yticklabels([str(int(l)) for l in np.arange(90, -1, -15)])
+    ax.legend(loc="upper right")
+    ax.set_title("Estimated Horizon Mask per Decoder")
+    horizon_plot = plot_filename("los_horizon_mask")
+    save_figure(fig, horizon_plot)
+
+    by_elevation = los_table(hist, ["decoder", "el_bin"]).reset_index()
+    fig = Figure(figsize=profile_figsize(16, 9))
+    ax1 = fig.add_subplot()
+    ax2 = ax1.twinx()
+    for decoder, group in by_elevation.groupby("decoder"):
+        centers = (group["el_bin"] + 0.5) * el_step
+        line, = ax1.plot(centers, group["mean_snr"], marker="o", label=f"{decoder.upper()} mean SNR")
+        ax2.plot(centers, 100 * group["lock_ratio"], linestyle="--", color=line.get_color(), label=f"{decoder.upper()} lock %")
+    ax1.set_xlabel("Elevation (deg)")
+    ax1.set_ylabel("Mean SNR (dB)")
+    ax2.set_ylabel("Deframer lock (%)")
+    ax2.set_ylim(0, 105)
+    handles1, labels1 = ax1.get_legend_handles_labels()
+    handles2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(handles1 + handles2, labels1 + labels2, loc="lower right")
+    ax1.set_title("SNR and Lock Ratio by Elevation")
+    elevation_plot = plot_filename("los_snr_by_elevation")
+    save_figure(fig, elevation_plot, dpi=300)
+
+    def table_html(table, index_label):
+        table = table.rename(columns={"samples": "Samples", "mean_snr": "Mean SNR", "std_snr": "SNR Std",
+                                      "lock_ratio": "Lock Ratio"})
+        return table.round(3).to_html(index_names=False, na_rep="-").replace("<th></th>", f"<th>{index_label}</th>", 1)
+
+    sectors = los_table(hist, ["az_bin"])
+    sectors.index = [f"{int(b * sector_width)}-{int((b + 1) * sector_width)}" for b in sectors.index]
+    bands = los_table(hist, ["el_bin"])
+    bands.index = [f"{int(b * el_step)}-{int((b + 1) * el_step)}" for b in bands.index]
+    satellites = los_table(hist, ["satellite", "decoder"])
+    satellites.index = [f"{satellite} ({decoder.upper()})" for satellite, decoder in satellites.index]
+    horizon = mask.apply(lambda col: col.map(lambda v: "no data" if pd.isna(v) else "never" if v >= 90 else f"{v:g}"))
+    horizon.index = [f"{int(b * sector_width)}-{int((b + 1) * sector_width)}" for b in horizon.index]
+    horizon.columns = [str(c).upper() for c in horizon.columns]
+    tables = [
+        {"title": "Horizon Mask (deg) by Azimuth Sector", "html": table_html(horizon, "Azimuth")},
+        {"title": "By Satellite and Decoder", "html": table_html(satellites, "Satellite")},
+        {"title": "By Elevation Band", "html": table_html(bands, "Elevation")},
+        {"title": "By Azimuth Sector", "html": table_html(sectors, "Azimuth")},
+    ]
+    html_content = Template(LOS_TEMPLATE).render(
+        samples=int(hist["samples"].sum()), passes=len(meta["passes"]), lock_threshold=round(100 * lock_threshold),
+        min_samples=min_samples, tables=tables, horizon_plot=os.path.basename(horizon_plot),
+        elevation_plot=os.path.basename(elevation_plot))
+    write_output(os.path.join(OUTPUT_DIR, "los_analysis.html"), html_content)
+    print("Line-of-sight analysis generated.")
+
+def plot_filename(*parts):
+    return os.path.join(OUTPUT_DIR, *parts) + "." + RENDER_PROFILE["format"]
+
+def thumbnail_path(plot_path):
+    return os.path.splitext(plot_path)[0] + "_thumb.png"
+
+def profile_figsize(width, height):
+    return (width * RENDER_PROFILE["scale"], height * RENDER_PROFILE["scale"])
+
+def save_figure(fig, path, dpi=None, thumbnail=False, thumb_size=200):
+    dpi = dpi or fig.dpi
+    if RENDER_PROFILE["dpi"] is not None:
+        dpi = min(dpi, RENDER_PROFILE["dpi"])
+    image_format = os.path.splitext(path)[1].lstrip(".")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, dpi=dpi)
+    if thumbnail and image_format == "svg":
+        # Vector output can't be opened by Pillow, so rasterise the thumbnail straight from the figure
+        thumb_buffer = io.BytesIO()
+        fig.savefig(thumb_buffer, format="png", dpi=thumb_size / max(fig.get_size_inches()))
+        write_output(path, buffer.getvalue())
+        write_output(thumbnail_path(path), thumb_buffer.getvalue())
+    else:
+        # Raster thumbnails are made from the encoded image in memory, not re-read from disk
+        write_output(path, buffer.getvalue(), thumbnail_path(path) if thumbnail else None, thumb_size)
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keep the point of each bucket that spans the largest triangle
+    # with the previously kept point and the average of the next bucket
+    n = len(x)
+    if threshold is None or threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+def downsample_pass(df):
+    budget = RENDER_PROFILE["point_budget"]
+    if not budget or len(df) <= budget:
+        return df
+    df = df.sort_values("Timestamp")
+    x = pd.to_datetime(df["Timestamp"]).astype("int64").to_numpy(dtype=float)
+    return df.iloc[lttb_indices(x, df["SNR"].to_numpy(dtype=float), budget)]
+
 def create_thumbnail(image_path, thumb_path, size=(200, 200)):
     if not os.path.exists(thumb_path):
         try:
@@ -400,92 +1220,182 @@ def generate_images_html(folder_name):
         if images_list:
             subfolders[rel_root] = images_list
     html_content = template.render(folder_name=folder_name, subfolders=subfolders)
-    out_path = os.path.join(OUTPUT_DIR, folder_name, "images.html")
-    with open(out_path, "w") as f:
-        f.write(html_content)
+    write_output(os.path.join(OUTPUT_DIR, folder_name, "images.html"), html_content)
     print(f"Images HTML generated for {folder_name}")
 
-def generate_summary_html(df):
+SUMMARY_PLOTS = (("snr_elevation", "SNR_and_Elevation_plot"), ("satellite_route", "satellite_route"),
+                 ("polar_plot", "polar_plot"), ("inverted_polar_plot", "polar_plot_inverted"))
+
+def summary_href(path):
+    # The viewer server uses OUTPUT_DIR as its web root, so client-mode links are relative to it;
+    # file:// summaries keep plain paths, which also work for an absolute OUTPUT_DIR
+    if path is None or OUTPUT_MODE != "client":
+        return path
+    return quote(os.path.relpath(path, OUTPUT_DIR).replace(os.sep, "/"))
+
+def pass_links(folder_name):
+    links = {"heatmap_link": None, "viewer_link": None,
+             "images_link": os.path.join(OUTPUT_DIR, folder_name, "images.html")}
+    for key, name in SUMMARY_PLOTS:
+        plot_path = plot_filename(folder_name, name)
+        thumb_path = thumbnail_path(plot_path)
+        links[f"{key}_link"] = links[f"{key}_thumb"] = None
+        # Retention may drop the full-size image and keep its thumbnail, so link whichever is left
+        if os.path.exists(plot_path) or os.path.exists(thumb_path):
+            links[f"{key}_link"] = plot_path if os.path.exists(plot_path) else thumb_path
+            links[f"{key}_thumb"] = thumb_path
+    hm_path = os.path.join(OUTPUT_DIR, folder_name, "satellite_route.html")
+    if os.path.exists(hm_path):
+        links["heatmap_link"] = hm_path
+    links = {key: summary_href(value) for key, value in links.items()}
+    if os.path.exists(os.path.join(OUTPUT_DIR, folder_name, "pass.json")):
+        links["viewer_link"] = summary_href(os.path.join(OUTPUT_DIR, "viewer.html")) + "#" + quote(folder_name)
+    return links
+
+def round_or_none(value, digits=2):
+    return round(float(value), digits) if value is not None and pd.notna(value) else None
+
+def generate_summary_html(stats):
     template = Template(SUMMARY_TEMPLATE)
     passes = []
-    df["folder_name"] = df["folder_name"].fillna("default")
-    for folder_name, group in df.groupby("folder_name"):
-        info = {
-            "satellite": group["satellite"].iloc[0],
-            "pass_start": group["Timestamp"].min().strftime("%Y-%m-%d<BR>%H:%M:%S") if pd.notnull(group["Timestamp"].min()) else "N/A",
-            "pass_end": group["Timestamp"].max().strftime("%H:%M:%S") if pd.notnull(group["Timestamp"].max()) else "N/A",
-            "max_snr": round(group["SNR"].astype(float).max(), 2) if not group["SNR"].isnull().all() else None,
-            "start_azimuth": round(group["Azimuth"].iloc[0], 2) if pd.notna(group["Azimuth"].iloc[0]) else None,
-            "end_azimuth": round(group["Azimuth"].iloc[-1], 2) if pd.notna(group["Azimuth"].iloc[-1]) else None,
-            "max_elevation": round(group["Elevation"].astype(float).max(), 2) if not group["Elevation"].isnull().all() else None,
-            "decoder": group["decoder"].iloc[0].upper() if "decoder" in group.columns else "UNKNOWN",
-            "snr_elevation_link": None,
-            "snr_elevation_thumb": None,
-            "satellite_route_link": None,
-            "satellite_route_thumb": None,
-            "polar_plot_link": None,
-            "polar_plot_thumb": None,
-            "inverted_polar_plot_link": None,
-            "inverted_polar_plot_thumb": None,
-            "heatmap_link": None,
-            "images_link": os.path.join(OUTPUT_DIR, folder_name, "images.html")
-        }
-        se_path = os.path.join(OUTPUT_DIR, folder_name, "SNR_and_Elevation_plot.png")
-        if os.path.exists(se_path):
-            info["snr_elevation_link"] = se_path
-            info["snr_elevation_thumb"] = se_path.replace(".png", "_thumb.png")
-        sr_path = os.path.join(OUTPUT_DIR, folder_name, "satellite_route.png")
-        if os.path.exists(sr_path):
-            info["satellite_route_link"] = sr_path
-            info["satellite_route_thumb"] = sr_path.replace(".png", "_thumb.png")
-        pp_path = os.path.join(OUTPUT_DIR, folder_name, "polar_plot.png")
-        if os.path.exists(pp_path):
-            info["polar_plot_link"] = pp_path
-            info["polar_plot_thumb"] = pp_path.replace(".png", "_thumb.png")
-        ipp_path = os.path.join(OUTPUT_DIR, folder_name, "polar_plot_inverted.png")
-        if os.path.exists(ipp_path):
-            info["inverted_polar_plot_link"] = ipp_path
-            info["inverted_polar_plot_thumb"] = ipp_path.replace(".png", "_thumb.png")
-        hm_path = os.path.join(OUTPUT_DIR, folder_name, "satellite_route.html")
-        if os.path.exists(hm_path):
-            info["heatmap_link"] = hm_path
-        passes.append(info)
-    html_content = template.render(passes=passes)
-    with open("summary.html", "w") as f:
-        f.write(html_content)
+    if stats is not None:
+        stats = stats[(stats["decoder"] != "apt") & (stats["retention"] != "removed")]
+    for folder_name, row in (stats.iterrows() if stats is not None else []):
+        passes.append({
+            "satellite": str(row["satellite"]).replace("-", " ", 1),
+            "pass_start": row["pass_start"].strftime("%Y-%m-%d<BR>%H:%M:%S") if pd.notnull(row["pass_start"]) else "N/A",
+            "pass_end": row["pass_end"].strftime("%H:%M:%S") if pd.notnull(row["pass_end"]) else "N/A",
+            "max_snr": round_or_none(row["snr_max"]),
+            "start_azimuth": round_or_none(row["start_azimuth"]),
+            "end_azimuth": round_or_none(row["end_azimuth"]),
+            "max_elevation": round_or_none(row["max_elevation"]),
+            "decoder": str(row["decoder"]).upper(),
+            "snr_p50": round_or_none(histogram_percentile(row["snr_hist"], 50)),
+            "snr_p90": round_or_none(histogram_percentile(row["snr_hist"], 90)),
+            "lock_ratio": round_or_none(100 * row["deframer_synced"] / row["samples"], 1) if row["samples"] else None,
+            "time_to_sync": round_or_none((row["first_sync"] - row["pass_start"]).total_seconds(), 0)
+                            if pd.notnull(row["first_sync"]) and pd.notnull(row["pass_start"]) else None,
+            "mean_ber": round_or_none(row["ber_sum"] / row["ber_count"], 4) if row["ber_count"] else None,
+            **pass_links(folder_name)
+        })
+    los_path = os.path.join(OUTPUT_DIR, "los_analysis.html")
+    html_content = template.render(passes=passes, los_link=summary_href(los_path) if os.path.exists(los_path) else None)
+    write_output("summary.html", html_content)
     print("Summary HTML generated.")
 
+def series_to_list(values, decimals):
+    values = pd.to_numeric(values, errors="coerce").round(decimals).astype(object)
+    return values.where(pd.notna(values), None).tolist()
+
+def write_pass_json(df, folder_name):
+    df = df.sort_values("Timestamp")
+    # Naive timestamps are encoded as if they were UTC so the viewer shows the same clock time
+    ts = pd.to_datetime(df["Timestamp"]).astype("datetime64[s]").astype("int64")
+    t0 = int(ts.iloc[0])
+    pass_ts = df["pass_timestamp"].iloc[0]
+    data = {
+        "folder_name": folder_name,
+        "satellite": df["satellite"].iloc[0],
+        "decoder": df["decoder"].iloc[0],
+        "pass_timestamp": str(pass_ts) if pd.notna(pass_ts) else None,
+        "t0": t0,
+        "t": (ts - t0).tolist(),
+        "snr": series_to_list(df["SNR"], 2),
+        "elevation": series_to_list(df["Elevation"], 2),
+        "azimuth": series_to_list(df["Azimuth"], 2),
+        "lat": series_to_list(df["lat"], 3),
+        "lon": series_to_list(df["lon"], 3),
+    }
+    write_output(os.path.join(OUTPUT_DIR, folder_name, "pass.json"), json.dumps(data, separators=(",", ":")))
+    print(f"Pass data written for {folder_name}")
+
+def write_viewer():
+    write_output(os.path.join(OUTPUT_DIR, "viewer.html"), VIEWER_TEMPLATE)
+    write_output(os.path.join(OUTPUT_DIR, "viewer.js"), VIEWER_JS)
+    print("Pass viewer written.")
+
 def generate_visualization_html(folder_name):
     template = Template(VISUALIZATION_TEMPLATE)
-    html_content = template.render(folder_name=folder_name)
-    out_dir = os.path.join(OUTPUT_DIR, folder_name)
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "visualization.html")
-    with open(out_path, "w") as f:
-        f.write(html_content)
+    html_content = template.render(folder_name=folder_name, image_ext=RENDER_PROFILE["format"])
+    write_output(os.path.join(OUTPUT_DIR, folder_name, "visualization.html"), html_content)
     print(f"Visualization HTML generated for {folder_name}")
 
-def plot_snr_and_elevation(df, folder_name):
-    df = df[df["SNR"].astype(float) != 0]
-    if df.empty:
-        print(f"No valid data in {folder_name} for SNR/Elevation plot.")
-        return
-    os.makedirs(os.path.join(OUTPUT_DIR, folder_name), exist_ok=True)
-    fig, ax1 = plt.subplots(figsize=(16, 9))
+def build_snr_elevation_template():
+    markers = RENDER_PROFILE["markers"]
+    fig = Figure(figsize=profile_figsize(16, 9))
+    ax1 = fig.add_subplot()
+    ax1.xaxis_date()
     ax1.set_xlabel("Timestamp")
     ax1.set_ylabel("SNR (dB)", color="tab:blue")
-    ax1.plot(df["Timestamp"], df["SNR"].astype(float), marker="o", linestyle="-", color="tab:blue")
+    snr_line, = ax1.plot([], [], marker="o" if markers else None, linestyle="-", color="tab:blue")
     ax1.tick_params(axis="y", labelcolor="tab:blue")
     ax1.tick_params(axis="x", rotation=45)
     ax2 = ax1.twinx()
     ax2.set_ylabel("Elevation (deg)", color="tab:green")
-    ax2.plot(df["Timestamp"], df["Elevation"].astype(float), marker="x", linestyle="--", color="tab:green")
+    elevation_line, = ax2.plot([], [], marker="x" if markers else None, linestyle="--", color="tab:green")
     ax2.tick_params(axis="y", labelcolor="tab:green")
-    plt.title(f"SNR and Elevation over Time for {folder_name}")
-    plot_path = os.path.join(OUTPUT_DIR, folder_name, "SNR_and_Elevation_plot.png")
-    plt.savefig(plot_path, dpi=300)
-    plt.close()
-    create_thumbnail(plot_path, plot_path.replace(".png", "_thumb.png"))
+    return {"fig": fig, "axes": (ax1, ax2), "snr_line": snr_line, "elevation_line": elevation_line}
+
+def build_route_template():
+    fig = Figure(figsize=profile_figsize(20, 12))
+    ax = fig.add_subplot(projection=ccrs.PlateCarree())
+    ax.add_feature(cfeature.LAND)
+    ax.add_feature(cfeature.OCEAN)
+    ax.add_feature(cfeature.COASTLINE)
+    ax.add_feature(cfeature.BORDERS, linestyle=":")
+    ax.set_global()
+    scatter = ax.scatter([0], [0], c=[0], cmap="jet", s=50, edgecolors="k", alpha=0.7,
+                         transform=ccrs.PlateCarree())
+    fig.colorbar(scatter, ax=ax, label="SNR")
+    return {"fig": fig, "ax": ax, "scatter": scatter}
+
+def build_polar_template(inverted=False):
+    fig = Figure(figsize=profile_figsize(18, 18))
+    ax = fig.add_subplot(projection="polar")
+    scatter = ax.scatter([0], [0], c=[0], cmap="jet", edgecolors="w", s=50)
+    ax.set_theta_zero_location("N")
+    ax.set_theta_direction(-1)
+    ax.set_ylim(0, 90)
+    if inverted:
+        ax.set_yticks(np.arange(0, 91, 15))
+        ax.set_yticklabels([str(int(l)) for l in np.arange(90, -1, -15)])
+    return {"fig": fig, "ax": ax, "scatter": scatter}
+
+PLOT_TEMPLATE_BUILDERS = {
+    "snr_elevation": build_snr_elevation_template,
+    "route": build_route_template,
+    "polar": build_polar_template,
+    "polar_inverted": partial(build_polar_template, inverted=True),
+}
+
+def get_plot_template(kind):
+    key = (kind, RENDER_PROFILE["scale"], RENDER_PROFILE["markers"])
+    if key not in PLOT_TEMPLATES:
+        PLOT_TEMPLATES[key] = PLOT_TEMPLATE_BUILDERS[kind]()
+    return PLOT_TEMPLATES[key]
+
+def update_scatter(scatter, x, y, values, vmin, vmax, size):
+    scatter.set_offsets(np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]))
+    scatter.set_array(np.asarray(values, dtype=float))
+    scatter.set_clim(vmin, vmax)
+    scatter.set_sizes([size])
+
+def plot_snr_and_elevation(df, folder_name):
+    df = df[df["SNR"].astype(float) != 0]
+    if df.empty:
+        print(f"No valid data in {folder_name} for SNR/Elevation plot.")
+        return
+    df = downsample_pass(df)
+    os.makedirs(os.path.join(OUTPUT_DIR, folder_name), exist_ok=True)
+    template = get_plot_template("snr_elevation")
+    x = mdates.date2num(pd.to_datetime(df["Timestamp"]).to_numpy())
+    template["snr_line"].set_data(x, df["SNR"].astype(float))
+    template["elevation_line"].set_data(x, df["Elevation"].astype(float))
+    for ax in template["axes"]:
+        ax.relim()
+        ax.autoscale_view()
+    template["axes"][1].set_title(f"SNR and Elevation over Time for {folder_name}")
+    save_figure(template["fig"], plot_filename(folder_name, "SNR_and_Elevation_plot"), dpi=300, thumbnail=True)
     print(f"SNR/Elevation plot generated for {folder_name}")
 
 def plot_satellite_route(df, folder_name):
@@ -494,23 +1404,13 @@ def plot_satellite_route(df, folder_name):
         if df.empty:
             print(f"No valid data in {folder_name} for Satellite Route plot.")
             return
+        df = downsample_pass(df)
         os.makedirs(os.path.join(OUTPUT_DIR, folder_name), exist_ok=True)
-        plt.figure(figsize=(20, 12))
-        ax = plt.axes(projection=ccrs.PlateCarree())
-        ax.add_feature(cfeature.LAND)
-        ax.add_feature(cfeature.OCEAN)
-        ax.add_feature(cfeature.COASTLINE)
-        ax.add_feature(cfeature.BORDERS, linestyle=":")
-
-        ax.set_global()
-        sc = plt.scatter(df["lon"], df["lat"], c=df["SNR"].astype(float), cmap="jet",
-                        s=50, edgecolors="k", alpha=0.7, transform=ccrs.PlateCarree())
-        plt.colorbar(sc, label="SNR")
-        plt.title(f"Satellite Route for {folder_name}")
-        plot_path = os.path.join(OUTPUT_DIR, folder_name, "satellite_route.png")
-        plt.savefig(plot_path, dpi=300)
-        plt.close()
-        create_thumbnail(plot_path, plot_path.replace(".png", "_thumb.png"))
+        template = get_plot_template("route")
+        snr = df["SNR"].astype(float)
+        update_scatter(template["scatter"], df["lon"], df["lat"], snr, snr.min(), snr.max(), 50)
+        template["ax"].set_title(f"Satellite Route for {folder_name}")
+        save_figure(template["fig"], plot_filename(folder_name, "satellite_route"), dpi=300, thumbnail=True)
         print(f"Satellite Route plot generated for {folder_name}")
     except:
         print(f"Error generating Satellite Route plot for {folder_name}")
@@ -522,30 +1422,13 @@ def generate_combined_route(df):
         print("No data for combined route.")
         return
 
-    fig = plt.figure(figsize=(20, 12))
-    ax = plt.axes(projection=ccrs.PlateCarree())
-    ax.add_feature(cfeature.LAND)
-    ax.add_feature(cfeature.OCEAN)
-    ax.add_feature(cfeature.COASTLINE)
-    ax.add_feature(cfeature.BORDERS, linestyle=":")
-    ax.set_global()
+    template = get_plot_template("route")
+    snr = df["SNR"].astype(float)
+    update_scatter(template["scatter"], df["lon"], df["lat"], snr, snr.min(), snr.max(), 10)
+    template["ax"].set_title("Combined Satellite Route for All Passes")
 
-    sc = ax.scatter(
-        df["lon"],
-        df["lat"],
-        c=df["SNR"].astype(float),
-        cmap="jet",
-        s=10,
-        edgecolors="k",
-        alpha=0.7,
-        transform=ccrs.PlateCarree()
-    )
-    plt.colorbar(sc, label="SNR")
-    plt.title("Combined Satellite Route for All Passes")
-
-    out_path = os.path.join(OUTPUT_DIR, "combined_satellite_route.png")
-    plt.savefig(out_path, dpi=300)
-    plt.close()
+    out_path = plot_filename("combined_satellite_route")
+    save_figure(template["fig"], out_path, dpi=300)
     print(f"Combined satellite route saved to {out_path}")
 
 
@@ -570,7 +1453,7 @@ def generate_heatmap(df, folder_name):
     HeatMap(heat_data).add_to(m)
 
     out_path = os.path.join(OUTPUT_DIR, folder_name, "satellite_route.html")
-    m.save(out_path)
+    write_output(out_path, m.get_root().render())
     print(f"Heatmap generated for {folder_name} at {out_path}")
 
 def generate_combined_heatmap(df):
@@ -600,88 +1483,190 @@ def generate_combined_heatmap(df):
     ).add_to(m)
 
     out_path = os.path.join(OUTPUT_DIR, "combined_heatmap.html")
-    m.save(out_path)
+    write_output(out_path, m.get_root().render())
     print(f"Combined heatmap generated at {out_path}")
 
 
+def draw_polar_scatter(df, title, filename, snr_min, snr_max, inverted=False, thumbnail=False):
+    template = get_plot_template("polar_inverted" if inverted else "polar")
+    elevation = df["Elevation"].to_numpy(dtype=float)
+    update_scatter(template["scatter"], np.deg2rad(df["Azimuth"].to_numpy(dtype=float)),
+                   90 - elevation if inverted else elevation, df["SNR"], snr_min, snr_max, 50)
+    template["ax"].set_title(title)
+    save_figure(template["fig"], filename, thumbnail=thumbnail)
+
 def plot_polar(df, folder_name, pass_timestamp, snr_min, snr_max):
-    fig = plt.figure(figsize=(18, 18))
-    ax = fig.add_subplot(111, polar=True)
-    for _, row in df.iterrows():
-        ax.scatter(np.deg2rad(row["Azimuth"]), row["Elevation"],
-                   c=[cm.jet(plt.Normalize(snr_min, snr_max)(row["SNR"]))], edgecolors="w", s=50)
-    ax.set_theta_zero_location("N")
-    ax.set_theta_direction(-1)
-    ax.set_ylim(0, 90)
-    plt.title(f"Polar Plot for {folder_name}\n(Pass at {pass_timestamp})")
-    filename = os.path.join(OUTPUT_DIR, folder_name, "polar_plot.png")
-    plt.savefig(filename)
-    plt.close()
-    create_thumbnail(filename, filename.replace(".png", "_thumb.png"))
+    df = downsample_pass(df)
+    draw_polar_scatter(df, f"Polar Plot for {folder_name}\n(Pass at {pass_timestamp})",
+                       plot_filename(folder_name, "polar_plot"), snr_min, snr_max, thumbnail=True)
     print(f"Polar Plot generated for {folder_name}")
 
 def plot_polar_map(df, folder_name, pass_timestamp, snr_min, snr_max):
-    fig = plt.figure(figsize=(18, 18))
-    ax = fig.add_subplot(111, polar=True)
-    for _, row in df.iterrows():
-        ax.scatter(np.deg2rad(row["Azimuth"]), 90 - row["Elevation"],
-                   c=[cm.jet(plt.Normalize(snr_min, snr_max)(row["SNR"]))], edgecolors="w", s=50)
-    ax.set_theta_zero_location("N")
-    ax.set_theta_direction(-1)
-    ax.set_ylim(0, 90)
-    ax.set_yticks(np.arange(0, 91, 15))
-    ax.set_yticklabels([str(int(l)) for l in np.arange(90, -1, -15)])
-    plt.title(f"Inverted Polar Plot for {folder_name}\n(Pass at {pass_timestamp})")
-    filename = os.path.join(OUTPUT_DIR, folder_name, "polar_plot_inverted.png")
-    plt.savefig(filename)
-    plt.close()
-    create_thumbnail(filename, filename.replace(".png", "_thumb.png"))
+    df = downsample_pass(df)
+    draw_polar_scatter(df, f"Inverted Polar Plot for {folder_name}\n(Pass at {pass_timestamp})",
+                       plot_filename(folder_name, "polar_plot_inverted"), snr_min, snr_max, inverted=True, thumbnail=True)
     print(f"Inverted Polar Plot generated for {folder_name}")
 
-def plot_polar_all(df, decoder, snr_min, snr_max):
-    fig = plt.figure(figsize=(18, 18))
-    ax = fig.add_subplot(111, polar=True)
-    for _, row in df.iterrows():
-        ax.scatter(np.deg2rad(row["Azimuth"]), row["Elevation"],
-                   c=[cm.jet(plt.Normalize(snr_min, snr_max)(row["SNR"]))], edgecolors="w", s=50)
+def bin_polar_samples(df, az_bins, el_bins):
+    # Aggregate samples into azimuth x elevation cells: sample count, mean SNR and max SNR
+    az = df["Azimuth"].to_numpy(dtype=float) % 360
+    el = df["Elevation"].to_numpy(dtype=float)
+    snr = df["SNR"].to_numpy(dtype=float)
+    visible = (el >= 0) & (el <= 90)
+    az, el, snr = az[visible], el[visible], snr[visible]
+
+    az_edges = np.linspace(0, 360, az_bins + 1)
+    el_edges = np.linspace(0, 90, el_bins + 1)
+    count, _, _ = np.histogram2d(az, el, bins=[az_edges, el_edges])
+    snr_sum, _, _ = np.histogram2d(az, el, bins=[az_edges, el_edges], weights=snr)
+
+    az_idx = np.clip(np.searchsorted(az_edges, az, side="right") - 1, 0, az_bins - 1)
+    el_idx = np.clip(np.searchsorted(el_edges, el, side="right") - 1, 0, el_bins - 1)
+    snr_max = np.full(count.shape, -np.inf)
+    np.maximum.at(snr_max, (az_idx, el_idx), snr)
+
+    empty = count == 0
+    snr_mean = np.divide(snr_sum, count, out=np.full(count.shape, np.nan), where=~empty)
+    snr_max[empty] = np.nan
+    return az_edges, el_edges, count, snr_mean, snr_max
+
+def plot_polar_histogram(df, title, filename, snr_min, snr_max, bins, stat="mean", inverted=False):
+    az_edges, el_edges, count, mean_grid, max_grid = bin_polar_samples(df, *bins)
+    values = max_grid if stat == "max" else mean_grid
+    radius = 90 - el_edges if inverted else el_edges
+    theta, r = np.meshgrid(np.deg2rad(az_edges), radius, indexing="ij")
+
+    fig = Figure(figsize=profile_figsize(18, 18))
+    ax = fig.add_subplot(projection="polar")
+    mesh = ax.pcolormesh(theta, r, np.ma.masked_invalid(values), cmap="jet",
+                         vmin=snr_min, vmax=snr_max, shading="flat")
+    # Colour shows the SNR statistic, opacity shows how many samples fell into the cell
+    if count.max() > 0:
+        mesh.set_alpha(0.25 + 0.75 * np.log1p(count) / np.log1p(count.max()))
+    fig.colorbar(mesh, ax=ax, shrink=0.6, pad=0.08, label=f"{stat.capitalize()} SNR (dB)")
     ax.set_theta_zero_location("N")
     ax.set_theta_direction(-1)
     ax.set_ylim(0, 90)
-    plt.title(f"Combined Polar Plot for Decoder {decoder}")
-    filename = os.path.join(OUTPUT_DIR, f"polar_plot_all_{decoder}".replace(":", "-").replace("/", "_") + ".png")
-    plt.savefig(filename)
-    plt.close()
+    if inverted:
+        ax.set_yticks(np.arange(0, 91, 15))
+        ax.set_yticklabels([str(int(l)) for l in np.arange(90, -1, -15)])
+    ax.set_title(f"{title}\n({int(count.sum())} samples, {int((count > 0).sum())} cells)")
+    save_figure(fig, filename)
+
+def plot_polar_all(df, decoder, snr_min, snr_max, histogram_threshold=None, bins=(72, 18), stat="mean"):
+    title = f"Combined Polar Plot for Decoder {decoder}"
+    filename = plot_filename(f"polar_plot_all_{decoder}".replace(":", "-").replace("/", "_"))
+    if histogram_threshold is not None and len(df) > histogram_threshold:
+        plot_polar_histogram(df, title, filename, snr_min, snr_max, bins, stat)
+        print(f"Combined Polar Histogram generated for Decoder {decoder}")
+        return
+    draw_polar_scatter(df, title, filename, snr_min, snr_max)
     print(f"Combined Polar Plot generated for Decoder {decoder}")
 
-def plot_polar_all_map(df, decoder, snr_min, snr_max):
-    fig = plt.figure(figsize=(18, 18))
-    ax = fig.add_subplot(111, polar=True)
-    for _, row in df.iterrows():
-        ax.scatter(np.deg2rad(row["Azimuth"]), 90 - row["Elevation"],
-                   c=[cm.jet(plt.Normalize(snr_min, snr_max)(row["SNR"]))], edgecolors="w", s=50)
-    ax.set_theta_zero_location("N")
-    ax.set_theta_direction(-1)
-    ax.set_ylim(0, 90)
-    ax.set_yticks(np.arange(0, 91, 15))
-    ax.set_yticklabels([str(int(l)) for l in np.arange(90, -1, -15)])
-    plt.title(f"Combined Inverted Polar Plot for Decoder {decoder}")
-    filename = os.path.join(OUTPUT_DIR, f"polar_plot_all_inverted_{decoder}".replace(":", "-").replace("/", "_") + ".png")
-    plt.savefig(filename)
-    plt.close()
+def plot_polar_all_map(df, decoder, snr_min, snr_max, histogram_threshold=None, bins=(72, 18), stat="mean"):
+    title = f"Combined Inverted Polar Plot for Decoder {decoder}"
+    filename = plot_filename(f"polar_plot_all_inverted_{decoder}".replace(":", "-").replace("/", "_"))
+    if histogram_threshold is not None and len(df) > histogram_threshold:
+        plot_polar_histogram(df, title, filename, snr_min, snr_max, bins, stat, inverted=True)
+        print(f"Combined Inverted Polar Histogram generated for Decoder {decoder}")
+        return
+    draw_polar_scatter(df, title, filename, snr_min, snr_max, inverted=True)
     print(f"Combined Inverted Polar Plot generated for Decoder {decoder}")
 
-TLE_URL = "https://celestrak.org/NORAD/elements/weather.txt"
+TLE_URLS = ["https://celestrak.org/NORAD/elements/weather.txt"]
+TLE_TIMEOUT = (5, 30)
 TLE_FILE_PATH_GLOBAL = None
 
+def configure_tle(config):
+    global TLE_FILE_PATH_GLOBAL, TLE_URLS, TLE_TIMEOUT
+    TLE_FILE_PATH_GLOBAL = config["TLE_FILE_PATH"]
+    TLE_URLS = config.get("TLE_URLS") or TLE_URLS
+    timeout = config.get("TLE_TIMEOUT", TLE_TIMEOUT)
+    # A single number is used for both the connect and the read timeout
+    TLE_TIMEOUT = float(timeout) if isinstance(timeout, (int, float)) else tuple(timeout)
+
+def tle_cache_path():
+    return TLE_FILE_PATH_GLOBAL + ".cache.json"
+
+def load_tle_cache():
+    try:
+        with open(tle_cache_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def fetch_tle_catalog(url, cached):
+    # Returns the catalog entry to cache (text plus validators) and whether it changed
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = requests.get(url, headers=headers, timeout=TLE_TIMEOUT)
+    if response.status_code == 304 and "text" in cached:
+        return cached, False
+    response.raise_for_status()
+    entry = {"text": response.text, "etag": response.headers.get("ETag"),
+             "last_modified": response.headers.get("Last-Modified")}
+    return entry, response.text != cached.get("text")
+
+def merge_tle_catalogs(texts):
+    # Merge three-line element sets, keeping the first occurrence of each NORAD catalog number
+    merged, seen = [], set()
+    for text in texts:
+        lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+        for i in range(len(lines) - 2):
+            name, line1, line2 = lines[i:i + 3]
+            if not (line1.startswith("1 ") and line2.startswith("2 ")) or name.startswith(("1 ", "2 ")):
+                continue
+            norad_id = line1[2:7].strip()
+            if norad_id not in seen:
+                seen.add(norad_id)
+                merged.extend([name, line1, line2])
+    return "\n".join(merged) + "\n" if merged else ""
+
 def download_tle():
+    cache = load_tle_cache()
+    results, failed = {}, []
+    with ThreadPoolExecutor(max_workers=min(8, len(TLE_URLS))) as executor:
+        futures = {url: executor.submit(fetch_tle_catalog, url, cache.get(url, {})) for url in TLE_URLS}
+        for url, future in futures.items():
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                print(f"Error downloading TLE from {url}: {e}")
+                failed.append(url)
+                if "text" in cache.get(url, {}):
+                    # Offline or failing catalog: keep using the last good copy
+                    results[url] = (cache[url], False)
+
+    if not results:
+        if os.path.exists(TLE_FILE_PATH_GLOBAL):
+            print("No TLE catalog reachable; using the existing TLE file.")
+        return os.path.exists(TLE_FILE_PATH_GLOBAL)
+
+    merged = merge_tle_catalogs(results[url][0]["text"] for url in TLE_URLS if url in results)
+    if not merged:
+        print("Downloaded TLE catalogs contain no element sets; keeping the existing TLE file.")
+        return os.path.exists(TLE_FILE_PATH_GLOBAL)
+    # A catalog with neither a fresh nor a cached copy would lose all its satellites from a rewrite
+    missing = [url for url in TLE_URLS if url not in results]
     try:
-        response = requests.get(TLE_URL)
-        response.raise_for_status()
-        with open(TLE_FILE_PATH_GLOBAL, "w") as f:
-            f.write(response.text)
-        print("TLE data downloaded.")
+        write_file_atomic(tle_cache_path(), json.dumps({url: entry for url, (entry, _) in results.items()}))
+        if missing and os.path.exists(TLE_FILE_PATH_GLOBAL):
+            print(f"{len(missing)} TLE catalogs unreachable with no cached copy; keeping the existing TLE file.")
+        elif not os.path.exists(TLE_FILE_PATH_GLOBAL) or any(changed for _, changed in results.values()):
+            write_file_atomic(TLE_FILE_PATH_GLOBAL, merged)
+            print(f"TLE data downloaded ({len(merged.splitlines()) // 3} satellites).")
+        elif failed:
+            print("Some TLE catalogs are unreachable; keeping the last good TLE file.")
+        else:
+            # Nothing changed upstream; refresh the mtime so the next check waits UPDATE_DAYS again
+            os.utime(TLE_FILE_PATH_GLOBAL)
+            print("TLE data unchanged.")
     except Exception as e:
-        print(f"Error downloading TLE: {e}")
+        print(f"Error writing TLE file: {e}")
+    return os.path.exists(TLE_FILE_PATH_GLOBAL)
 
 def download_tle_if_necessary(update_days):
     if not os.path.exists(TLE_FILE_PATH_GLOBAL):
@@ -703,8 +1688,7 @@ def process_logs(config):
     obs_lon = config["OBSERVER_LON"]
     obs_elev = config["OBSERVER_ELEVATION"]
 
-    global TLE_FILE_PATH_GLOBAL
-    TLE_FILE_PATH_GLOBAL = tle_file
+    configure_tle(config)
 
     if not os.path.exists(datset_dir):
         print(f"Error: Input directory '{datset_dir}' not found.")
@@ -718,29 +1702,54 @@ def process_logs(config):
         print("No log files found.")
         return
 
-    entries = process_log_files(files)
+    entries = process_log_files(files, config.get("DEDUP_WINDOW", 100000))
     df = merge_rows(create_dataframe(entries))
     df["folder_name"] = df["folder_name"].fillna("default")
-    df = add_dataset_json_data(df, json_directory=datset_dir)
+    df = add_dataset_json_data(df, json_directory=datset_dir, tolerance=config.get("DATASET_MATCH_TOLERANCE", 300),
+                               max_duration=config.get("MAX_PASS_DURATION", 1200))
     df["decoder"] = df["folder_name"].apply(extract_decoder_from_folder_name)
     df = df[~df["satellite"].str.contains("Unknown", na=False)]
+    retained = retained_passes("compacted")
+    if retained:
+        df = df[~df["folder_name"].isin(retained)]
+        print(f"Skipped samples of {len(retained)} compacted or removed passes.")
 
     df.to_csv("parsed_log_data.csv", index=False)
     print("Parsed log data saved.")
 
     if not os.path.exists(tle_file):
         print("TLE file not found; downloading...")
-        download_tle()
+        if not download_tle():
+            print("Error: No TLE data available. Check TLE_URLS and your network connection.")
+            return
 
     satellites = SKYFIELD_LOADER.tle_file(tle_file)
     enriched_df = add_azimuth_elevation_distance(df, satellites, obs_lat, obs_lon, obs_elev)
     enriched_df.to_csv("final_processed_log_data_enriched.csv", index=False)
     print("Enriched log data saved.")
+    if not enriched_df.empty:
+        update_pass_statistics(compute_pass_statistics(enriched_df))
+        update_los_histograms(prepare_enriched_data(enriched_df), config.get("LOS_AZIMUTH_SECTORS", 36),
+                              config.get("LOS_ELEVATION_STEP", 5))
+
+def load_enriched_data():
+    return prepare_enriched_data(pd.read_csv("final_processed_log_data_enriched.csv", parse_dates=["Timestamp", "pass_timestamp"]))
+
+def prepare_enriched_data(df):
+    # Visualization and the line-of-sight histograms both bin this frame, so they agree on names and passes
+    df = df.copy()
+    df["SNR"] = pd.to_numeric(df["SNR"], errors="coerce")
+    df["Azimuth"] = pd.to_numeric(df["Azimuth"], errors="coerce")
+    df["Elevation"] = pd.to_numeric(df["Elevation"], errors="coerce")
+
+    df = df[df["decoder"] != "apt"]
+    df = df[pd.notna(df["Azimuth"]) & pd.notna(df["Elevation"]) & pd.notna(df["SNR"])]
+    df = df[np.isfinite(df["Azimuth"]) & np.isfinite(df["Elevation"]) & np.isfinite(df["SNR"])]
+    df["satellite"] = df["satellite"].str.replace("-", " ", 1)
+    return df
 
 def visualize_data(config):
-    global TLE_FILE_PATH_GLOBAL
-    if TLE_FILE_PATH_GLOBAL is None:
-        TLE_FILE_PATH_GLOBAL = config["TLE_FILE_PATH"]
+    configure_tle(config)
     obs_lat = config["OBSERVER_LAT"]
     obs_lon = config["OBSERVER_LON"]
     obs_elev = config["OBSERVER_ELEVATION"]
@@ -752,60 +1761,314 @@ def visualize_data(config):
 
     download_tle_if_necessary(update_days)
 
-    df = pd.read_csv("final_processed_log_data_enriched.csv", parse_dates=["Timestamp", "pass_timestamp"])
-    df["SNR"] = pd.to_numeric(df["SNR"], errors="coerce")
-    df["Azimuth"] = pd.to_numeric(df["Azimuth"], errors="coerce")
-    df["Elevation"] = pd.to_numeric(df["Elevation"], errors="coerce")
-
-    df = df[df["decoder"] != "apt"]
-    df = df[pd.notna(df["Azimuth"]) & pd.notna(df["Elevation"]) & pd.notna(df["SNR"])]
-    df = df[np.isfinite(df["Azimuth"]) & np.isfinite(df["Elevation"]) & np.isfinite(df["SNR"])]
-    df["satellite"] = df["satellite"].str.replace("-", " ", 1)
+    df = load_enriched_data()
 
-    for folder_name, group in df.groupby("folder_name"):
+    global OUTPUT_SINK
+    OUTPUT_SINK = OutputSink(config.get("WRITE_QUEUE_SIZE", 16))
+    try:
+        render_visualizations(df, config)
+    finally:
+        errors = OUTPUT_SINK.close()
+        OUTPUT_SINK = None
+    for path, error in errors:
+        print(Fore.RED + f"Error writing {path}: {error}" + Style.RESET_ALL)
+
+    if not os.path.exists("pass_statistics.csv"):
+        # Enriched data from before the statistics stage existed
+        update_pass_statistics(compute_pass_statistics(pd.read_csv("final_processed_log_data_enriched.csv")))
+    generate_summary_html(load_pass_statistics())
+    if errors:
+        print(Fore.RED + f"Visualization generation finished with {len(errors)} write errors." + Style.RESET_ALL)
+    else:
+        print("Visualization generation complete.")
+
+def render_visualizations(df, config):
+    histogram_threshold = config.get("POLAR_HISTOGRAM_THRESHOLD", 5000)
+    histogram_bins = tuple(config.get("POLAR_HISTOGRAM_BINS", (72, 18)))
+    histogram_stat = config.get("POLAR_HISTOGRAM_STAT", "mean")
+    if histogram_stat not in POLAR_HISTOGRAM_STATS:
+        print(f"Unknown polar histogram statistic '{histogram_stat}'; using 'mean'.")
+        histogram_stat = "mean"
+    client_mode = OUTPUT_MODE == "client"
+    images = set(config.get("CLIENT_RENDERED_IMAGES", [])) if client_mode else set(PASS_IMAGES)
+    if client_mode:
+        write_viewer()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    generate_combined_heatmap(df)
+    generate_combined_route(df)
+
+    # Combined plots above still cover purged passes; only their per-pass outputs stay removed
+    purged = retained_passes("purged")
+    for folder_name, group in df[~df["folder_name"].isin(purged)].groupby("folder_name"):
         print(f"Generating visualizations for {folder_name}")
         os.makedirs(os.path.join(OUTPUT_DIR, folder_name), exist_ok=True)
-        generate_combined_heatmap(df)
-        generate_combined_route(df)
-        plot_snr_and_elevation(group, folder_name)
-        plot_satellite_route(group, folder_name)
-        generate_heatmap(group, folder_name)
-        generate_visualization_html(folder_name)
+        if client_mode:
+            write_pass_json(group, folder_name)
+        if "snr_elevation" in images:
+            plot_snr_and_elevation(group, folder_name)
+        if "satellite_route" in images:
+            plot_satellite_route(group, folder_name)
+        if "heatmap" in images:
+            generate_heatmap(group, folder_name)
+        if not client_mode:
+            generate_visualization_html(folder_name)
         generate_images_html(folder_name)
         snr_min = group["SNR"].min()
         snr_max = group["SNR"].max()
         for pass_ts in group["pass_timestamp"].unique():
             pass_df = group[group["pass_timestamp"] == pass_ts]
-            plot_polar(pass_df, folder_name, pass_ts, snr_min, snr_max)
-            plot_polar_map(pass_df, folder_name, pass_ts, snr_min, snr_max)
+            if "polar" in images:
+                plot_polar(pass_df, folder_name, pass_ts, snr_min, snr_max)
+            if "polar_inverted" in images:
+                plot_polar_map(pass_df, folder_name, pass_ts, snr_min, snr_max)
     for decoder in df["decoder"].unique():
         ddf = df[df["decoder"] == decoder]
         snr_min = ddf["SNR"].min()
         snr_max = ddf["SNR"].max()
-        plot_polar_all(ddf, decoder, snr_min, snr_max)
-        plot_polar_all_map(ddf, decoder, snr_min, snr_max)
-    generate_summary_html(df)
-    print("Visualization generation complete.")
+        plot_polar_all(ddf, decoder, snr_min, snr_max, histogram_threshold, histogram_bins, histogram_stat)
+        plot_polar_all_map(ddf, decoder, snr_min, snr_max, histogram_threshold, histogram_bins, histogram_stat)
+
+    hist, meta = load_los_histograms()
+    az_sectors, el_step = config.get("LOS_AZIMUTH_SECTORS", 36), config.get("LOS_ELEVATION_STEP", 5)
+    if meta is None or (meta["azimuth_sectors"], meta["elevation_step"]) != (az_sectors, el_step):
+        # Enriched data from before the analytics stage existed, or the bins were reconfigured
+        hist, meta = update_los_histograms(df, az_sectors, el_step)
+    generate_los_report(hist, meta, config.get("LOS_LOCK_THRESHOLD", 0.8), config.get("LOS_MIN_SAMPLES", 20))
+
+# Serves summary.html from the working directory and everything else from OUTPUT_DIR only, so
+# config.json, the CSVs and the TLE cache next to the script are never published
+class ViewerRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        if urlsplit(path).path == "/summary.html":
+            return os.path.realpath("summary.html")
+        return super().translate_path(path)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_viewer_server():
+    global VIEWER_SERVER
+    if VIEWER_SERVER is None:
+        handler = partial(ViewerRequestHandler, directory=os.path.realpath(OUTPUT_DIR))
+        VIEWER_SERVER = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=VIEWER_SERVER.serve_forever, daemon=True).start()
+        print(f"Serving visualizations at http://127.0.0.1:{VIEWER_SERVER.server_port}/ until exit.")
+    return f"http://127.0.0.1:{VIEWER_SERVER.server_port}/"
 
 def open_summary():
     if os.path.exists("summary.html"):
-        webbrowser.open("file://" + os.path.realpath("summary.html"))
+        if OUTPUT_MODE == "client":
+            webbrowser.open(start_viewer_server() + "summary.html")
+        else:
+            webbrowser.open("file://" + os.path.realpath("summary.html"))
         print("Opening summary...")
     else:
         print("Summary not found. Generate visualizations first.")
 
 def purge_generated_files():
-    for f in ["parsed_log_data.csv", "final_processed_log_data_enriched.csv", "summary.html"]:
+    for f in ["parsed_log_data.csv", "final_processed_log_data_enriched.csv", "pass_statistics.csv",
+              "los_histograms.csv", "los_histograms.json", "summary.html"]:
         if os.path.exists(f):
             os.remove(f)
     if OUTPUT_DIR and os.path.exists(OUTPUT_DIR):
         shutil.rmtree(OUTPUT_DIR)
     print("Generated files purged.")
 
+# Artifact types that can be purged selectively from the output directory
+ARTIFACT_TYPES = {
+    "images": "Full-size plot images",
+    "thumbnails": "Plot thumbnails",
+    "heatmaps": "Folium heatmaps",
+    "pages": "Per-pass HTML pages and the pass viewer",
+    "data": "Per-pass JSON data",
+}
+
+def classify_artifact(filename):
+    name, ext = os.path.splitext(filename)
+    ext = ext.lower()
+    if name.endswith("_thumb") or name.startswith("thumb_"):
+        return "thumbnails"
+    if ext in (".png", ".webp", ".svg", ".jpg", ".jpeg"):
+        return "images"
+    if filename in ("satellite_route.html", "combined_heatmap.html"):
+        return "heatmaps"
+    if ext in (".html", ".js"):
+        return "pages"
+    if ext == ".json":
+        return "data"
+    return None
+
+def select_passes(older_than_days=None, satellite=None, decoder=None):
+    # Pass metadata comes from the enriched CSV and from the statistics of already compacted passes
+    frames = []
+    if os.path.exists("final_processed_log_data_enriched.csv"):
+        df = pd.read_csv("final_processed_log_data_enriched.csv", usecols=["folder_name", "satellite", "decoder", "Timestamp"],
+                         parse_dates=["Timestamp"])
+        frames.append(df.groupby("folder_name").agg(satellite=("satellite", "first"), decoder=("decoder", "first"),
+                                                    pass_end=("Timestamp", "max")).reset_index())
+    stats = load_pass_statistics()
+    if stats is not None:
+        frames.append(stats.reset_index()[["folder_name", "satellite", "decoder", "pass_end"]])
+    if not frames:
+        return set()
+    passes = pd.concat(frames, ignore_index=True).drop_duplicates("folder_name")
+    passes = passes[~passes["folder_name"].isin(retained_passes("removed"))]
+    mask = pd.Series(True, index=passes.index)
+    if older_than_days is not None:
+        mask &= passes["pass_end"] < datetime.now() - timedelta(days=older_than_days)
+    if satellite:
+        # Satellite names are spelled with dashes or spaces depending on where they come from
+        names = passes["satellite"].astype(str).str.replace(r"[\s-]+", " ", regex=True).str.lower()
+        mask &= names == re.sub(r"[\s-]+", " ", satellite).lower()
+    if decoder:
+        mask &= passes["decoder"].astype(str).str.lower() == decoder.lower()
+    return set(passes.loc[mask, "folder_name"])
+
+def purge_pass_outputs(folder_names, artifact_types=None):
+    removed = 0
+    for folder_name in folder_names:
+        pass_dir = os.path.join(OUTPUT_DIR, folder_name)
+        if not os.path.isdir(pass_dir):
+            continue
+        if artifact_types is None:
+            shutil.rmtree(pass_dir)
+            removed += 1
+            continue
+        for root, dirs, files in os.walk(pass_dir):
+            for file in files:
+                if classify_artifact(file) in artifact_types:
+                    os.remove(os.path.join(root, file))
+                    removed += 1
+    return removed
+
+def purge_artifacts(artifact_types):
+    if not OUTPUT_DIR or not os.path.exists(OUTPUT_DIR):
+        return 0
+    removed = 0
+    for root, dirs, files in os.walk(OUTPUT_DIR):
+        for file in files:
+            if classify_artifact(file) in artifact_types:
+                os.remove(os.path.join(root, file))
+                removed += 1
+    return removed
+
+def drop_pass_rows(folder_names):
+    paths = ["parsed_log_data.csv", "final_processed_log_data_enriched.csv"]
+    for path in paths:
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            df[~df["folder_name"].isin(folder_names)].to_csv(path, index=False)
+
+def drop_los_rows(folder_names):
+    hist, meta = load_los_histograms()
+    if meta is None or not isinstance(meta["passes"], dict):
+        return
+    meta["passes"] = {folder: n for folder, n in meta["passes"].items() if folder not in folder_names}
+    save_los_histograms(hist[~hist["folder_name"].isin(folder_names)], meta)
+
+def mark_retention(folder_names, level):
+    # Retention lives on the statistics rows, so passes without one get it computed from their samples first
+    stats = load_pass_statistics()
+    missing = set(folder_names) - (set(stats.index) if stats is not None else set())
+    if missing and os.path.exists("final_processed_log_data_enriched.csv"):
+        df = pd.read_csv("final_processed_log_data_enriched.csv")
+        df = df[df["folder_name"].isin(missing)]
+        if not df.empty:
+            update_pass_statistics(compute_pass_statistics(df))
+            stats = load_pass_statistics()
+    if stats is None:
+        return
+    raise_level = stats.index.isin(folder_names) & (stats["retention"].map(RETENTION_LEVELS).fillna(0) < RETENTION_LEVELS[level])
+    stats.loc[raise_level, "retention"] = level
+    save_pass_statistics(stats)
+
+def compact_passes(folder_names):
+    # Keep only the per-pass statistics of the given passes and drop their per-sample rows
+    if not folder_names or not os.path.exists("final_processed_log_data_enriched.csv"):
+        return 0
+    df = pd.read_csv("final_processed_log_data_enriched.csv", usecols=["folder_name"])
+    compacted = set(df.loc[df["folder_name"].isin(folder_names), "folder_name"])
+    if not compacted:
+        return 0
+    mark_retention(compacted, "compacted")
+    drop_pass_rows(compacted)
+    return len(compacted)
+
+def refresh_summary():
+    if os.path.exists("summary.html"):
+        generate_summary_html(load_pass_statistics())
+
+def ask_days(prompt):
+    try:
+        return float(input(prompt).strip())
+    except ValueError:
+        print("Invalid number of days.")
+        return None
+
+def purge_menu():
+    print("\n" + Fore.CYAN + Style.BRIGHT + "----- Purge Generated Files -----" + Style.RESET_ALL)
+    print(Fore.YELLOW + "1. Everything" + Style.RESET_ALL)
+    print(Fore.YELLOW + "2. Visualizations of passes older than N days" + Style.RESET_ALL)
+    print(Fore.YELLOW + "3. Compact sample data of passes older than N days into per-pass statistics" + Style.RESET_ALL)
+    print(Fore.YELLOW + "4. Passes of a satellite or decoder (data and visualizations)" + Style.RESET_ALL)
+    print(Fore.YELLOW + "5. Artifact type" + Style.RESET_ALL)
+    print(Fore.YELLOW + "6. Cancel" + Style.RESET_ALL)
+    choice = input("Choice (1-6): ").strip()
+    if choice == "1":
+        purge_generated_files()
+        return
+    elif choice == "2":
+        days = ask_days("Remove visualizations of passes older than how many days? ")
+        if days is None:
+            return
+        folder_names = select_passes(older_than_days=days)
+        removed = purge_pass_outputs(folder_names)
+        mark_retention(folder_names, "purged")
+        print(f"Removed visualizations of {removed} passes.")
+    elif choice == "3":
+        days = ask_days("Compact passes older than how many days? ")
+        if days is None:
+            return
+        compacted = compact_passes(select_passes(older_than_days=days))
+        print(f"Compacted {compacted} passes into pass_statistics.csv.")
+    elif choice == "4":
+        satellite = input("Satellite name (empty for any): ").strip()
+        decoder = input("Decoder (empty for any): ").strip()
+        if not satellite and not decoder:
+            print("Give a satellite, a decoder or both.")
+            return
+        folder_names = select_passes(satellite=satellite, decoder=decoder)
+        purge_pass_outputs(folder_names)
+        mark_retention(folder_names, "removed")
+        drop_pass_rows(folder_names)
+        drop_los_rows(folder_names)
+        print(f"Removed {len(folder_names)} passes.")
+    elif choice == "5":
+        for name, description in ARTIFACT_TYPES.items():
+            print(f"  {name}: {description}")
+        types = {t.strip() for t in input("Artifact types to remove (comma separated): ").split(",") if t.strip()}
+        unknown = types - set(ARTIFACT_TYPES)
+        if unknown or not types:
+            print(f"Unknown artifact types: {', '.join(sorted(unknown)) or 'none given'}.")
+            return
+        removed = purge_artifacts(types)
+        print(f"Removed {removed} files.")
+    elif choice == "6":
+        return
+    else:
+        print("Invalid choice.")
+        return
+    refresh_summary()
+
 def main_menu():
     config = load_config()
-    global OUTPUT_DIR
+    global OUTPUT_DIR, RENDER_PROFILE, OUTPUT_MODE
     OUTPUT_DIR = config.get("OUTPUT_DIRECTORY", "visualizations")
+    RENDER_PROFILE = get_render_profile(config)
+    OUTPUT_MODE = config.get("OUTPUT_MODE", "images")
+    if OUTPUT_MODE not in OUTPUT_MODES:
+        print(f"Unknown output mode '{OUTPUT_MODE}'; using 'images'.")
+        OUTPUT_MODE = "images"
 
     # Warn about default location
     if config.get("OBSERVER_LAT", 0) == 0 and config.get("OBSERVER_LON", 0) == 0:
@@ -871,7 +2134,7 @@ def main_menu():
             else:
                 print("Open Summary HTML is disabled: summary.html not found.")
         elif choice == "4":
-            purge_generated_files()
+            purge_menu()
             # Refresh everything
             parsed_exists = os.path.exists("parsed_log_data.csv")
             enriched_exists = os.path.exists("final_processed_log_data_enriched.csv")